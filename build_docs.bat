@@ -15,17 +15,14 @@ REM Install documentation requirements
 echo 📦 Installing documentation dependencies...
 pip install -r docs\requirements.txt
 
-REM Install the project in development mode
-pip install -e .
-
 echo 📚 Building documentation...
 
 REM Clean previous builds
 if exist "docs\_build" rmdir /s /q "docs\_build"
 
-REM Build HTML documentation
+REM Build HTML documentation, reading and writing pages on all CPU cores
 cd docs
-make html
+sphinx-build -j auto -b html . _build\html
 
 echo ✅ Documentation built successfully!
 echo 📖 Open docs\_build\html\index.html to view the documentation
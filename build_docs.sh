@@ -17,17 +17,14 @@ source venv/bin/activate
 echo "📦 Installing documentation dependencies..."
 pip install -r docs/requirements.txt
 
-# Install the project in development mode
-pip install -e .
-
 echo "📚 Building documentation..."
 
 # Clean previous builds
 rm -rf docs/_build
 
-# Build HTML documentation
+# Build HTML documentation, reading and writing pages on all CPU cores
 cd docs
-make html
+sphinx-build -j auto -b html . _build/html
 
 echo "✅ Documentation built successfully!"
 echo "📖 Open docs/_build/html/index.html to view the documentation"
@@ -6,19 +6,6 @@
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
 
-import os
-import sys
-sys.path.insert(0, os.path.abspath('..'))
-
-# Mock imports for modules that might not be available during doc build
-autodoc_mock_imports = [
-    'scrapy',
-    'psycopg2',
-    'SQLAlchemy',
-    'itemadapter',
-    'twisted',
-]
-
 project = 'Scrapy Item Ingest'
 copyright = '2025, Fawad Ali'
 author = 'Fawad Ali'
@@ -28,8 +15,9 @@ release = '0.2.2'
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#general-configuration
 
 extensions = [
-    'sphinx.ext.autodoc',
+    # viewcode must load first so AutoAPI can serve its source lookups statically
     'sphinx.ext.viewcode',
+    'autoapi.extension',
     'sphinx.ext.napoleon',
     'sphinx.ext.intersphinx',
     'sphinx.ext.todo',
@@ -76,24 +64,6 @@ html_css_files = [
     'css/custom.css',  # Custom CSS for dark theme
 ]
 
-# Ensure _static directory exists
-import os
-os.makedirs('_static', exist_ok=True)
-
-# Create custom.css file for dark theme
-custom_css_path = os.path.join('_static', 'css')
-os.makedirs(custom_css_path, exist_ok=True)
-with open(os.path.join(custom_css_path, 'custom.css'), 'w') as f:
-    f.write("""
-    body {
-        background-color: #121212;
-        color: #ffffff;
-    }
-    a {
-        color: #1e90ff;
-    }
-    """)
-
 # -- Extension configuration -------------------------------------------------
 
 # Napoleon settings
@@ -112,16 +82,26 @@ napoleon_preprocess_types = False
 napoleon_type_aliases = None
 napoleon_attr_annotations = True
 
-# Autodoc settings
-autodoc_default_options = {
-    'members': True,
-    'member-order': 'bysource',
-    'special-members': '__init__',
-    'undoc-members': True,
-    'exclude-members': '__weakref__'
-}
+# AutoAPI settings: API pages are generated by parsing the source statically,
+# so the package and its runtime dependencies are never imported.
+autoapi_type = 'python'
+autoapi_dirs = ['../scrapy_item_ingest']
+# The hand-written pages under api/ use the autoapi* directives; no extra tree
+autoapi_generate_api_docs = False
+autoapi_member_order = 'bysource'
+autoapi_options = [
+    'members',
+    'undoc-members',
+    'special-members',
+    'show-inheritance',
+    'show-module-summary',
+    'imported-members',
+]
+
+# Don't let viewcode import modules for names AutoAPI could not resolve
+viewcode_follow_imported_members = False
 
-# Don't fail on import errors
+# Type hints rendering (honored by AutoAPI)
 autodoc_typehints = 'description'
 autodoc_typehints_description_target = 'documented'
 
@@ -8,6 +8,7 @@ accessing settings dynamically and offers default fallbacks where values are
 not explicitly defined. Utility function `validate_settings` ensures critical
 configuration is present.
 """
+import uuid
 
 
 class Settings:
@@ -24,6 +25,8 @@ class Settings:
     DEFAULT_REQUESTS_TABLE = 'job_requests'
     DEFAULT_LOGS_TABLE = 'job_logs'
     DEFAULT_TIMEZONE = "Asia/Karachi"
+    DEFAULT_IDENTIFIER_TYPE = 'TEXT'
+    DEFAULT_DB_POOL_SIZE = 8
 
     def __init__(self, crawler_settings):
         self.crawler_settings = crawler_settings
@@ -42,6 +45,19 @@ class Settings:
         """
         return self.crawler_settings.get('DB_URL')
 
+    @property
+    def db_pool_size(self):
+        """
+        Maximum number of pooled database connections.
+
+        Scrapy's own thread, and each running crawler's request writer and log
+        writer, keep one connection each. Defaults to `DEFAULT_DB_POOL_SIZE`.
+
+        :return: The maximum pool size.
+        :rtype: int
+        """
+        return self.crawler_settings.getint('DB_POOL_SIZE', self.DEFAULT_DB_POOL_SIZE)
+
     @property
     def db_type(self):
         """
@@ -113,6 +129,16 @@ class Settings:
         """Get the identifier column name"""
         return "job_id"
 
+    def get_identifier_type(self):
+        """
+        Return the SQL type of the identifier column.
+        'UUID' when the JOB_ID_TYPE setting is 'uuid' (case-insensitive), else 'TEXT'.
+        Returns:
+            str: 'UUID' or 'TEXT'.
+        """
+        identifier_type = str(self.crawler_settings.get('JOB_ID_TYPE', self.DEFAULT_IDENTIFIER_TYPE))
+        return 'UUID' if identifier_type.upper() == 'UUID' else self.DEFAULT_IDENTIFIER_TYPE
+
     def get_identifier_value(self, spider):
         """Get the identifier value with smart fallback"""
         job_id = self.crawler_settings.get('JOB_ID', None)
@@ -131,4 +157,13 @@ def validate_settings(settings):
         raise ValueError("DB_URL must be set in settings")
 
     # Job ID is now optional - will use spider name as fallback
+    if settings.get_identifier_type() == 'UUID':
+        # ...except for UUID columns, where a spider name can never be cast
+        job_id = settings.crawler_settings.get('JOB_ID')
+        if not job_id:
+            raise ValueError("JOB_ID must be set when JOB_ID_TYPE is 'uuid'")
+        try:
+            uuid.UUID(str(job_id))
+        except ValueError:
+            raise ValueError(f"JOB_ID must be a valid UUID when JOB_ID_TYPE is 'uuid', got {job_id!r}")
     return True
@@ -1,11 +1,15 @@
 # scrapy_item_ingest/database/connection.py
 
+import hashlib
 import logging
+import threading
+from contextlib import contextmanager
 from typing import Optional, Any, Sequence
 from urllib.parse import urlsplit, urlunsplit, quote, unquote
 
-import psycopg2
-from psycopg2 import OperationalError
+from psycopg2 import OperationalError, errors
+from psycopg2.extensions import STATUS_READY, TRANSACTION_STATUS_INERROR, parse_dsn
+from psycopg2.pool import ThreadedConnectionPool
 
 
 class DBConnection:
@@ -13,26 +17,58 @@ class DBConnection:
     PostgreSQL connection manager (singleton) with a small convenience API used by
     pipelines and schema utilities. Supports either a DSN/URL or settings-based
     configuration and exposes `connect/execute/commit/rollback/close` methods.
+
+    Connections come from a thread-safe pool. Each thread borrows its own
+    connection on first use and keeps it until `release` or `close`, so the
+    pipelines and the background log writer never share a transaction.
+    Crawlers in the same process share the pool: each registers with
+    `acquire` and the pool is only closed when the last one calls `close`.
     """
 
     _instance = None  # Singleton instance
-    _connection = None
+    _lock = threading.Lock()  # Guards singleton and pool creation
+    _pool: Optional[ThreadedConnectionPool] = None
     _db_url: Optional[str] = None
+    _conn_kwargs: Optional[dict] = None  # Resolved once, reused on reconnect
+    _conn_source = "unknown"
+    _POOL_MINCONN = 1
+    _POOL_MAXCONN = 8  # Default; callers may ask for a larger pool
+    # libpq options for every connection. TCP keepalives stop NAT gateways and
+    # firewalls from silently dropping the connection while a crawl is idle.
+    _CONNECT_OPTIONS = {
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
+        "connect_timeout": 10,
+        "application_name": "scrapy_item_ingest",
+    }
     _logger = logging.getLogger(__name__)
 
-    def __new__(cls, db_url: Optional[str] = None):
+    def __new__(cls, db_url: Optional[str] = None, pool_size: Optional[int] = None):
         # Ensure only one instance exists (singleton) and accept optional db_url
-        if cls._instance is None:
-            cls._instance = super(DBConnection, cls).__new__(cls)
-            if db_url:
-                cls._instance._db_url = db_url
-            cls._instance._initialize_connection()
-        else:
-            # If an URL is passed later and we don't have one stored yet, keep it
-            if db_url and cls._instance._db_url is None:
-                cls._instance._db_url = db_url
-                # Do not auto-reconnect here; next use will reconnect if needed
-        return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(DBConnection, cls).__new__(cls)
+                cls._instance._statements = {}
+                cls._instance._local = threading.local()
+                cls._instance._users = 0
+                cls._instance._pool_maxconn = max(cls._POOL_MINCONN, pool_size or cls._POOL_MAXCONN)
+                if db_url:
+                    cls._instance._db_url = db_url
+                cls._instance._initialize_pool()
+            else:
+                # If an URL is passed later and we don't have one stored yet, keep it
+                if db_url and cls._instance._db_url is None:
+                    cls._instance._db_url = db_url
+                    cls._instance._conn_kwargs = None
+                    # Do not auto-reconnect here; next use will reconnect if needed
+                if pool_size and pool_size > cls._instance._pool_maxconn:
+                    # Another crawler needs more connections; the pool only grows
+                    cls._instance._pool_maxconn = pool_size
+                    if cls._instance._pool is not None:
+                        cls._instance._pool.maxconn = pool_size
+            return cls._instance
 
     def _normalize_dsn(self, dsn: str) -> str:
         """Normalize a PostgreSQL DSN/URL by URL-encoding credentials if needed.
@@ -62,87 +98,273 @@ class DBConnection:
         except Exception:
             return dsn
 
-    def _initialize_connection(self):
-        """Initialize the PostgreSQL connection once (or reconnect if closed)."""
-        if self._connection is not None and getattr(self._connection, "closed", 0) == 0:
-            return
+    def _build_connect_kwargs(self):
+        """Resolve connection parameters once; returns (kwargs, source)."""
+        if self._db_url:
+            dsn = self._normalize_dsn(self._db_url)
+            try:
+                explicit = set(parse_dsn(dsn))
+            except Exception:
+                explicit = set()
+            kwargs = {"dsn": dsn}
+            source = "db_url"
+        else:
+            # Lazy import to avoid module-level dependency on Scrapy
+            from scrapy.utils.project import get_project_settings
+            settings = get_project_settings()
+            kwargs = {
+                "host": settings.get("DB_HOST"),
+                "port": settings.get("DB_PORT"),
+                "user": settings.get("DB_USER"),
+                "password": settings.get("DB_PASSWORD"),
+                "dbname": settings.get("DB_NAME"),
+            }
+            explicit = set()
+            source = "Scrapy settings"
+        # Options spelled out in the DSN take precedence over our defaults
+        for key, value in self._CONNECT_OPTIONS.items():
+            if key not in explicit:
+                kwargs[key] = value
+        return kwargs, source
+
+    def _initialize_pool(self):
+        """Create the connection pool once (or again after `close`)."""
+        if self._pool is not None and not self._pool.closed:
+            return self._pool
 
-        source = "unknown"
+        if self._conn_kwargs is None:
+            self._conn_kwargs, self._conn_source = self._build_connect_kwargs()
         try:
-            if self._db_url:
-                source = "db_url"
-                dsn = self._normalize_dsn(self._db_url)
-                self._connection = psycopg2.connect(dsn)
-            else:
-                # Lazy import to avoid module-level dependency on Scrapy
-                from scrapy.utils.project import get_project_settings
-                settings = get_project_settings()
-                source = "Scrapy settings"
-                self._connection = psycopg2.connect(
-                    host=settings.get("DB_HOST"),
-                    port=settings.get("DB_PORT"),
-                    user=settings.get("DB_USER"),
-                    password=settings.get("DB_PASSWORD"),
-                    dbname=settings.get("DB_NAME"),
-                )
-            self._connection.autocommit = False  # manual commit per item
+            self._pool = ThreadedConnectionPool(
+                self._POOL_MINCONN, self._pool_maxconn, **self._conn_kwargs
+            )
         except OperationalError as e:
             # Mask password in logs by not printing full URL; provide hint
             self._logger.error(
                 "Failed to connect to database via %s: %s. "
                 "Verify DB settings or DSN (host, port, user, dbname).",
-                source,
+                self._conn_source,
                 str(e),
             )
             raise
+        return self._pool
+
+    def _thread_connection(self):
+        """Return the calling thread's connection, borrowing one if needed."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and not conn.closed and local.pool is self._pool:
+            return conn
+
+        if conn is not None:
+            self._discard_thread_connection()
+        with self._lock:
+            pool = self._initialize_pool()
+        conn = pool.getconn()
+        if conn.closed:
+            # Pooled connection died while idle; replace it
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        conn.autocommit = False  # manual commit per item
+        local.conn = conn
+        local.pool = pool
+        local.cursor = None
+        # Prepared statements belong to the server session. Pooled sessions are
+        # handed back with none (see `_discard_thread_connection`).
+        local.prepared = set()
+        return conn
+
+    def _discard_thread_connection(self, close: bool = True):
+        """Give the calling thread's connection back to the pool it came from."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        pool = getattr(local, "pool", None)
+        cur = getattr(local, "cursor", None)
+        prepared = getattr(local, "prepared", None)
+        local.conn = local.pool = local.cursor = None
+        local.prepared = set()
+        if cur is not None:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        if conn is None:
+            return
+        try:
+            if pool is not None and not pool.closed:
+                if not close and not conn.closed:
+                    try:
+                        self._reset_session(conn, prepared)
+                    except Exception as e:
+                        self._logger.debug("Could not reset database connection: %s", e)
+                        close = True
+                pool.putconn(conn, close=close or conn.closed)
+            elif not conn.closed:
+                conn.close()
+        except Exception as e:
+            self._logger.debug("Error while releasing database connection: %s", e)
+
+    @staticmethod
+    def _reset_session(conn, prepared):
+        """Make a connection safe to hand to the next borrower."""
+        # Never hand over an open transaction...
+        conn.rollback()
+        if prepared:
+            # ...nor our prepared statements: its own PREPARE would fail
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DEALLOCATE ALL")
+            finally:
+                conn.autocommit = False
 
     # Public API expected by pipelines/schema
     def connect(self) -> bool:
         try:
-            self._initialize_connection()
+            self._thread_connection()
             return True
         except Exception:
             return False
 
     def cursor(self):
-        if self._connection is None or getattr(self._connection, "closed", 1):
-            self._initialize_connection()
-        return self._connection.cursor()
+        """Return a new cursor; the caller owns it and must close it."""
+        return self._thread_connection().cursor()
+
+    def _thread_cursor(self):
+        """Return the calling thread's reusable cursor on its connection."""
+        conn = self._thread_connection()
+        cur = self._local.cursor
+        if cur is None or cur.closed or cur.connection is not conn:
+            cur = conn.cursor()
+            self._local.cursor = cur
+        return cur
 
     def execute(self, sql: str, params: Sequence[Any] = None):
         """Execute a SQL statement.
         Returns the first row (tuple) if the statement produces a result set
         (e.g., SELECT or INSERT ... RETURNING), otherwise returns None.
         """
-        with self.cursor() as cur:
-            if params is not None:
-                cur.execute(sql, params)
-            else:
-                cur.execute(sql)
-            # If the statement returns rows, fetch one for callers expecting a value
-            if cur.description is not None:
-                row = cur.fetchone()
-                return row
-            return None
+        cur = self._thread_cursor()
+        if params is not None:
+            cur.execute(sql, params)
+        else:
+            cur.execute(sql)
+        # If the statement returns rows, fetch one for callers expecting a value
+        if cur.description is not None:
+            row = cur.fetchone()
+            return row
+        return None
+
+    def prepare(self, name: str, sql: str) -> str:
+        """Register a server-side prepared statement and return the name to
+        pass to `execute_prepared`.
+        ``sql`` uses PostgreSQL ``$1, $2, ...`` placeholders. The statement is
+        PREPAREd lazily, once per connection, by `execute_prepared`. The
+        returned name carries a digest of ``sql``, so crawlers sharing this
+        connection with different tables never run each other's statements.
+        """
+        name = f"{name}_{hashlib.sha1(sql.encode()).hexdigest()[:12]}"
+        self._statements[name] = sql
+        return name
+
+    def execute_prepared(self, name: str, params: Sequence[Any] = ()):
+        """Execute a statement registered with `prepare`, skipping server-side
+        parsing and planning after the first call on a connection.
+        Returns the first row if the statement produces a result set, otherwise None.
+        """
+        sql = self._statements[name]
+        execute_sql = f"EXECUTE {name}"
+        if params:
+            execute_sql += " (" + ", ".join(["%s"] * len(params)) + ")"
+
+        cur = self._thread_cursor()
+        # Statements the caller has not committed yet; a retry must not lose them
+        in_transaction = cur.connection.status != STATUS_READY
+        prepared = self._local.prepared
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+        try:
+            cur.execute(execute_sql, params)
+        except errors.InvalidSqlStatementName:
+            # Dropped server-side (e.g. DISCARD ALL); the next call prepares again
+            prepared.discard(name)
+            if in_transaction:
+                # The failed EXECUTE aborted the caller's transaction, and
+                # rolling it back here would discard its earlier statements
+                raise
+            # Nothing else was in the aborted transaction: roll back and retry once
+            cur.connection.rollback()
+            cur.execute(f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+            cur.execute(execute_sql, params)
+        if cur.description is not None:
+            return cur.fetchone()
+        return None
+
+    @contextmanager
+    def autocommit(self):
+        """Commit each statement in the block as it executes.
+        Saves the BEGIN and COMMIT round trips around single-statement writes.
+        If the thread already has a transaction open, the block joins it and
+        leaves the commit to whoever opened it. A transaction that has already
+        failed is rolled back first, since nothing could be added to it.
+        """
+        conn = self._thread_connection()
+        if conn.info.transaction_status == TRANSACTION_STATUS_INERROR:
+            conn.rollback()
+        if conn.status != STATUS_READY:
+            yield
+            return
+        conn.autocommit = True
+        try:
+            yield
+        finally:
+            conn.autocommit = False
 
     def commit(self):
-        if self._connection:
-            self._connection.commit()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.commit()
 
     def rollback(self):
-        if self._connection:
-            self._connection.rollback()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.rollback()
 
     def get_connection(self):
-        """Return the active connection (always the same one)."""
-        if self._connection is None or getattr(self._connection, "closed", 1):
-            self._initialize_connection()
-        return self._connection
+        """Return the calling thread's connection."""
+        return self._thread_connection()
+
+    def release(self):
+        """Return the calling thread's connection to the pool, rolling back
+        anything uncommitted. The next call from this thread borrows again."""
+        self._discard_thread_connection(close=False)
+
+    def acquire(self):
+        """Register a user of the shared pool, such as a crawler's pipeline.
+        Pair every call with `close`."""
+        with self._lock:
+            self._users += 1
 
     def close(self):
-        """Close connection gracefully when the spider ends."""
-        if self._connection and not self._connection.closed:
-            self._connection.close()
+        """Close every pooled connection gracefully once the last user
+        registered with `acquire` is done; until then only give back the
+        calling thread's connection, since other crawlers are still writing."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            last_user = self._users == 0
+        if not last_user:
+            self.release()
+            return
+        self._discard_thread_connection()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and not pool.closed:
+            try:
+                pool.closeall()
+            except Exception as e:
+                self._logger.debug("Error while closing database connections: %s", e)
 
 
 # Backwards compatibility: older code imports `DatabaseConnection`
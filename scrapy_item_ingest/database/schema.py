@@ -3,6 +3,8 @@ Database schema management utilities for scrapy_item_ingest.
 """
 import logging
 
+from psycopg2.extras import register_uuid
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,26 +14,48 @@ class SchemaManager:
     def __init__(self, db_connection, settings):
         self.db = db_connection
         self.settings = settings
+        self.identifier_type = settings.get_identifier_type()
+        if self.identifier_type == 'UUID':
+            # Let uuid.UUID job ids be passed as query parameters
+            register_uuid()
 
-    def create_items_table(self):
-        """Create items table if it doesn't exist"""
-        items_table_sql = f"""
+    @staticmethod
+    def _index_name(table, *columns):
+        """Index name for one or more columns; index names cannot be schema-qualified"""
+        return f"{table.rsplit('.', 1)[-1]}_{'_'.join(columns)}_idx"
+
+    def _index_sql(self, table, *columns, method="btree", name=None):
+        """DDL for an index on the given columns or expressions (B-tree unless
+        `method` says otherwise). Expressions need an explicit `name`."""
+        return (
+            f"CREATE INDEX IF NOT EXISTS {name or self._index_name(table, *columns)} "
+            f"ON {table} USING {method} ({', '.join(columns)})"
+        )
+
+    def _items_table_sql(self):
+        """DDL for the items table"""
+        return f"""
         CREATE TABLE IF NOT EXISTS {self.settings.db_items_table} (
             id SERIAL PRIMARY KEY,
-            job_id VARCHAR(255),
+            job_id {self.identifier_type},
             item JSONB,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+        );
+        {self._index_sql(self.settings.db_items_table, 'job_id')}
         """
-        self.db.execute(items_table_sql)
-        logger.info(f"Items table {self.settings.db_items_table} created/verified with job_id column")
 
-    def create_requests_table(self):
-        """Create requests table if it doesn't exist"""
-        requests_table_sql = f"""
+    def _requests_table_sql(self):
+        """DDL for the requests table"""
+        table = self.settings.db_requests_table
+        # URLs are unbounded and a long one would overflow a B-tree entry, so
+        # parent lookups go through an index on their hash
+        url_index = self._index_sql(
+            table, 'job_id', 'md5(url)', name=self._index_name(table, 'job_id', 'url_md5')
+        )
+        return f"""
         CREATE TABLE IF NOT EXISTS {self.settings.db_requests_table} (
             id SERIAL PRIMARY KEY,
-            job_id VARCHAR(255),
+            job_id {self.identifier_type},
             url TEXT,
             method VARCHAR(10),
             status_code INTEGER,
@@ -42,25 +66,68 @@ class SchemaManager:
             parent_url TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (parent_id) REFERENCES {self.settings.db_requests_table}(id)
-        )
+        );
+        {self._index_sql(self.settings.db_requests_table, 'job_id')};
+        {self._index_sql(self.settings.db_requests_table, 'fingerprint')};
+        {self._index_sql(self.settings.db_requests_table, 'parent_id')};
+        {url_index}
         """
-        self.db.execute(requests_table_sql)
-        logger.info(f"Requests table {self.settings.db_requests_table} created/verified with job_id column")
 
-    def create_logs_table(self):
-        """Create logs table if it doesn't exist"""
-        logs_table_sql = f"""
+    def _logs_table_sql(self):
+        """DDL for the logs table.
+        Append-only with no surrogate key; rows arrive in time order, so a
+        BRIN index covers timestamp range scans at a fraction of a B-tree's size.
+        """
+        return f"""
         CREATE TABLE IF NOT EXISTS {self.settings.db_logs_table} (
-            id SERIAL PRIMARY KEY,
-            job_id VARCHAR(255),
+            job_id {self.identifier_type},
             level VARCHAR(50),
             message TEXT,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+        );
+        {self._index_sql(self.settings.db_logs_table, 'job_id')};
+        {self._index_sql(self.settings.db_logs_table, 'timestamp', method='brin')}
         """
-        self.db.execute(logs_table_sql)
+
+    def create_items_table(self):
+        """Create items table if it doesn't exist"""
+        self.db.execute(self._items_table_sql())
+        logger.info(f"Items table {self.settings.db_items_table} created/verified with job_id column")
+
+    def create_requests_table(self):
+        """Create requests table if it doesn't exist"""
+        self.db.execute(self._requests_table_sql())
+        logger.info(f"Requests table {self.settings.db_requests_table} created/verified with job_id column")
+
+    def create_logs_table(self):
+        """Create logs table if it doesn't exist"""
+        self.db.execute(self._logs_table_sql())
         logger.info(f"Logs table {self.settings.db_logs_table} created/verified with job_id column")
 
+    def check_identifier_type(self, *tables):
+        """Raise ValueError if an existing table's job_id column doesn't match JOB_ID_TYPE.
+        Tables keep the type they were created with, and PostgreSQL cannot
+        compare a UUID job id with a text column (or the other way round).
+        """
+        column = self.settings.get_identifier_column()
+        expect_uuid = self.identifier_type == 'UUID'
+        try:
+            for table in tables:
+                row = self.db.execute(
+                    "SELECT format_type(atttypid, atttypmod), atttypid = 'uuid'::regtype "
+                    "FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s "
+                    "AND NOT attisdropped",
+                    (table, column),
+                )
+                if row and row[1] != expect_uuid:
+                    raise ValueError(
+                        f"{table}.{column} is {row[0]} but JOB_ID_TYPE is "
+                        f"'{self.identifier_type.lower()}'; JOB_ID_TYPE only applies "
+                        f"to newly created tables"
+                    )
+        finally:
+            self.db.rollback()
+
     def ensure_tables_exist(self):
         """Create all tables if they don't exist (only if create_tables is True)"""
         if not self.settings.create_tables:
@@ -68,9 +135,12 @@ class SchemaManager:
             return
 
         try:
-            self.create_items_table()
-            self.create_requests_table()
-            self.create_logs_table()
+            # All DDL goes to the server as one multi-statement round trip
+            self.db.execute(";\n".join([
+                self._items_table_sql(),
+                self._requests_table_sql(),
+                self._logs_table_sql(),
+            ]))
             self.db.commit()
             logger.info("All tables created/verified successfully")
         except Exception as e:
@@ -1,7 +1,13 @@
 """
 Base extension functionality for scrapy_item_ingest.
 """
+import io
 import logging
+from datetime import datetime
+
+import pytz
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.extras import execute_values
 
 from scrapy_item_ingest.config.settings import Settings, validate_settings
 from ..utils.time import get_current_datetime
@@ -10,10 +16,19 @@ from ..database.schema import SchemaManager
 
 logger = logging.getLogger(__name__)
 
+# Backslash, tab and line breaks must be escaped in COPY's text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
 
 class BaseExtension:
     """Base extension with common functionality"""
 
+    # Batches at least this large are streamed with COPY instead of INSERT;
+    # extensions that batch records lower it to their batch size
+    LOG_COPY_THRESHOLD = 500
+    # Server-side prepared statement used for single log records
+    LOG_INSERT_STATEMENT = "sii_log_insert"
+
     def __init__(self, settings):
         self.settings = settings
         validate_settings(settings)
@@ -22,6 +37,20 @@ class BaseExtension:
         self._schema_manager = None
         # Prevent repeated error spam if DB logging fails
         self._db_logging_enabled = True
+        self._log_copy_threshold = self.LOG_COPY_THRESHOLD
+        self._log_insert_statement = None
+        # Logs INSERTs are invariant for the extension's lifetime; build them once
+        insert_prefix = (
+            f"INSERT INTO {self.settings.db_logs_table} "
+            f"({self.settings.get_identifier_column()}, level, message, timestamp) "
+        )
+        self._log_sql = insert_prefix + "VALUES ($1, $2, $3, $4)"
+        self._log_many_sql = insert_prefix + "VALUES %s"
+        self._log_copy_sql = (
+            f"COPY {self.settings.db_logs_table} "
+            f"({self.settings.get_identifier_column()}, level, message, timestamp) "
+            f"FROM STDIN WITH (FORMAT text)"
+        )
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -36,12 +65,18 @@ class BaseExtension:
     def _ensure_db_initialized(self):
         """Initialize DB connection and schema manager lazily."""
         if self._db is None:
-            self._db = DatabaseConnection(self.settings.db_url)
+            self._db = DatabaseConnection(self.settings.db_url, self.settings.db_pool_size)
             if not self._db.connect():
                 raise RuntimeError("Failed to connect to database for logging")
+            self._log_insert_statement = self._db.prepare(self.LOG_INSERT_STATEMENT, self._log_sql)
         if self._schema_manager is None:
             self._schema_manager = SchemaManager(self._db, self.settings)
 
+    def _release_db(self):
+        """Return the calling thread's pooled connection, if it borrowed one."""
+        if self._db is not None:
+            self._db.release()
+
     def _ensure_logs_table_exists(self):
         """Create logs table if it doesn't exist (only if create_tables is True)."""
         if not self.settings.create_tables:
@@ -52,22 +87,28 @@ class BaseExtension:
         except Exception as e:
             self._db.rollback()
 
+    def _prepare_db_logging(self):
+        """Connect and verify the logs table once, before any record is written."""
+        if not self._db_logging_enabled:
+            return
+        try:
+            self._ensure_db_initialized()
+            self._ensure_logs_table_exists()
+            self._schema_manager.check_identifier_type(self.settings.db_logs_table)
+        except Exception as e:
+            logger.warning("Database logging disabled: %s", e)
+            self._db_logging_enabled = False
+
     def _log_to_database(self, spider, log_level, message):
         """Helper method to log messages to database using shared DBConnection."""
         if not self._db_logging_enabled:
             return
         try:
             self._ensure_db_initialized()
-            self._ensure_logs_table_exists()
 
-            identifier_column, identifier_value = self.get_identifier_info(spider)
-            sql = f"""
-                INSERT INTO {self.settings.db_logs_table}
-                ({identifier_column}, level, message, timestamp)
-                VALUES (%s, %s, %s, %s)
-            """
-            self._db.execute(
-                sql,
+            identifier_value = self.settings.get_identifier_value(spider)
+            self._db.execute_prepared(
+                self._log_insert_statement,
                 (
                     identifier_value,
                     log_level,
@@ -77,5 +118,95 @@ class BaseExtension:
             )
             self._db.commit()
         except Exception as e:
+            # Don't leave a failed transaction behind for the next statement
+            self._rollback_quietly()
             # Disable further DB logging to avoid spamming errors
             self._db_logging_enabled = False
+
+    def _log_to_database_many(self, rows):
+        """Write a batch of ``(job_id, level, message, timestamp)`` rows in a single statement."""
+        if not self._db_logging_enabled or not rows:
+            return
+        try:
+            try:
+                self._write_log_rows(rows)
+            except (InterfaceError, OperationalError):
+                # The shared connection may have been closed by a pipeline in the
+                # meantime; the next cursor() reconnects, so retry once.
+                self._write_log_rows(rows)
+        except (InterfaceError, OperationalError):
+            # Still no usable connection; disable further DB logging to avoid spamming errors
+            self._db_logging_enabled = False
+            self._rollback_quietly()
+        except Exception:
+            # One bad record (e.g. a NUL byte) fails the whole statement, so
+            # fall back to row-by-row inserts to keep the rest of the batch
+            self._rollback_quietly()
+            self._write_log_rows_singly(rows)
+
+    def _write_log_rows_singly(self, rows):
+        """Insert and commit rows one at a time, skipping any that fail."""
+        written = 0
+        for row in rows:
+            try:
+                self._db.execute_prepared(self._log_insert_statement, row)
+                self._db.commit()
+                written += 1
+            except Exception:
+                self._rollback_quietly()
+        if not written:
+            # Nothing can be stored; disable further DB logging to avoid spamming errors
+            self._db_logging_enabled = False
+
+    def _rollback_quietly(self):
+        try:
+            self._db.rollback()
+        except Exception:
+            pass
+
+    def _write_log_rows(self, rows):
+        """Insert prepared log rows and commit, using COPY for large batches."""
+        self._ensure_db_initialized()
+        with self._db.cursor() as cur:
+            session_tz = None
+            if len(rows) >= self._log_copy_threshold:
+                session_tz = self._session_timezone(cur.connection)
+            if session_tz is not None:
+                cur.copy_expert(self._log_copy_sql, self._to_copy_buffer(rows, session_tz))
+            else:
+                # Also used when the session time zone is unknown to pytz: the
+                # timestamptz cast then lets the server do the conversion
+                execute_values(cur, self._log_many_sql, rows, page_size=len(rows))
+            # Commit on the connection the rows were sent to: if it was closed
+            # meanwhile this raises instead of silently skipping the commit
+            cur.connection.commit()
+
+    @staticmethod
+    def _session_timezone(connection):
+        """Return the session TimeZone as a pytz zone, or None if pytz can't parse it."""
+        try:
+            return pytz.timezone(connection.info.parameter_status('TimeZone'))
+        except Exception:
+            return None
+
+    @staticmethod
+    def _to_copy_buffer(rows, session_tz):
+        """Render log rows as a PostgreSQL COPY text-format stream."""
+        # Aware timestamps are shifted to the session time zone, matching how
+        # psycopg2 stores them through a timestamptz cast on the INSERT path.
+        buf = io.StringIO()
+        for row in rows:
+            fields = []
+            for value in row:
+                if value is None:
+                    fields.append("\\N")
+                    continue
+                if isinstance(value, datetime):
+                    if value.tzinfo is not None:
+                        value = value.astimezone(session_tz).replace(tzinfo=None)
+                    value = value.isoformat(' ')
+                fields.append(str(value).translate(_COPY_ESCAPES))
+            buf.write("\t".join(fields))
+            buf.write("\n")
+        buf.seek(0)
+        return buf
@@ -3,8 +3,12 @@ Logging extension for capturing spider errors and logs and saving them to the da
 """
 from __future__ import annotations
 
+import copy
 import logging
+import queue
 import threading
+import time
+from functools import lru_cache
 from typing import List
 
 from scrapy import signals
@@ -12,32 +16,54 @@ from scrapy.spiders import Spider
 from scrapy.crawler import Crawler
 
 from .base import BaseExtension
+from ..utils.time import get_datetime_from_timestamp
 
 logger = logging.getLogger(__name__)
 
 
 class ScrapyAndRootFilter(logging.Filter):
     """
-    A logging filter that allows records from the 'root' logger and any logger
-    within the 'scrapy' namespace.
+    A logging filter that allows records from the 'root' logger, the spider's
+    own logger and any logger within the 'scrapy' namespace.
     """
+    def __init__(self, spider_name: str | None = None):
+        super().__init__()
+        self._exact = frozenset(name for name in ('root', spider_name) if name)
+        self._prefixes = ('scrapy',)
+        # The same few logger names recur for every record; memoize the verdict
+        self._match = lru_cache(maxsize=256)(self._match_name)
+
+    def _match_name(self, name: str) -> bool:
+        return name in self._exact or name.startswith(self._prefixes)
+
     def filter(self, record: logging.LogRecord) -> bool:
-        # Allow logs from the spider itself (which might not be in 'scrapy' namespace)
-        if hasattr(record, 'spider_name') and record.name == getattr(record, 'spider_name', None):
-            return True
-        return record.name == 'root' or record.name.startswith('scrapy')
+        return self._match(record.name)
 
 
 class DatabaseLogHandler(logging.Handler):
     """
-    Custom logging handler to save log records to the database in real-time.
+    Custom logging handler that queues log records and saves them to the
+    database from a background writer thread, one multi-row INSERT per batch.
+    A batch is written once it holds ``batch_size`` records or its oldest
+    record has waited ``flush_interval`` seconds. A record's message is
+    rendered when it is logged; the rest of the formatting is left to the
+    writer, right before the record is written.
     """
     _local = threading.local()
 
-    def __init__(self, extension: 'LoggingExtension', spider: Spider):
+    def __init__(self, extension: 'LoggingExtension', spider: Spider, batch_size: int = 100,
+                 queue_size: int = 10000, flush_interval: float = 1.0):
         super().__init__()
         self.extension = extension
         self.spider = spider
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped_records = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="DatabaseLogHandler-writer", daemon=True
+        )
+        self._writer.start()
 
     def emit(self, record: logging.LogRecord):
         if getattr(self._local, 'in_emit', False):
@@ -49,18 +75,122 @@ class DatabaseLogHandler(logging.Handler):
 
         self._local.in_emit = True
         try:
-            # Add spider name to record for the filter
-            record.spider_name = self.spider.name
-            msg = self.format(record)
-            level = record.levelname
-            # Log directly to the database in real-time
-            self.extension._log_to_database(self.spider, level, msg)
+            self._enqueue(self._prepare(record))
         except Exception:
             # Use logger directly to avoid recursion if formatting fails
             logger.exception("Error in DatabaseLogHandler.emit")
         finally:
             self._local.in_emit = False
 
+    def _prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Freeze a record before it waits in the queue, as QueueHandler.prepare does.
+        Its arguments may be mutated by the time the writer runs, and a
+        traceback would keep every frame of the failing call alive. The copy
+        leaves the record other handlers see untouched.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            formatter = self.formatter or logging.Formatter()
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue_message(self, level: str, message: str):
+        """Queue a message that did not come through a logger (e.g. a signal
+        callback) so it is written with the next batch like any other record."""
+        record = logging.makeLogRecord({
+            'name': self.spider.name,
+            'levelname': level,
+            'levelno': logging.getLevelName(level),
+            'msg': message,
+        })
+        self._enqueue(record)
+
+    def _enqueue(self, record: logging.LogRecord):
+        # Never block the logging thread on the database; drop when saturated
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+    def _writer_loop(self):
+        """Drain the queue in batches of up to ``batch_size`` until stopped."""
+        # Records logged by this thread while writing must not be re-queued
+        self._local.in_emit = True
+        stopping = False
+        while not stopping:
+            records: List[logging.LogRecord] = []
+            flushed = None
+            entry = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if entry is None:
+                    stopping = True
+                    break
+                if isinstance(entry, threading.Event):
+                    # flush() marker: everything queued before it is in this batch
+                    flushed = entry
+                    break
+                records.append(entry)
+                if len(records) >= self.batch_size:
+                    break
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        entry = self._queue.get(timeout=remaining)
+                    else:
+                        entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if records:
+                    self.extension._log_to_database_many(self._format_records(records))
+            except Exception:
+                logger.exception("Error in DatabaseLogHandler writer")
+            if flushed is not None:
+                flushed.set()
+        # The writer's pooled connection is not needed once it stops
+        self.extension._release_db()
+
+    def _format_records(self, records: List[logging.LogRecord]) -> List[tuple]:
+        """Turn queued records into ``(job_id, level, message, timestamp)`` rows."""
+        settings = self.extension.settings
+        identifier_value = settings.get_identifier_value(self.spider)
+        rows = []
+        for record in records:
+            try:
+                # Timestamp is when the record was created, not when it is written
+                timestamp = get_datetime_from_timestamp(settings, record.created)
+                rows.append((identifier_value, record.levelname, self.format(record), timestamp))
+            except Exception:
+                logger.exception("Error formatting record in DatabaseLogHandler")
+        return rows
+
+    def flush(self, timeout: float = 5):
+        """Wait until records queued so far have been written."""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self):
+        """Stop the writer thread once queued records have been written."""
+        if self._writer.is_alive():
+            try:
+                self._queue.put(None, timeout=5)
+            except queue.Full:
+                pass
+            self._writer.join(timeout=5)
+        if self.dropped_records:
+            logger.warning("Dropped %d log records: database log queue was full", self.dropped_records)
+        super().close()
+
 
 class LoggingExtension(BaseExtension):
     """
@@ -73,6 +203,13 @@ class LoggingExtension(BaseExtension):
         self.log_level = crawler_settings.get('LOG_LEVEL', 'INFO').upper()
         self.log_format = '%(asctime)s [%(name)s] %(levelname)s: %(message)s'
         self.log_dateformat = '%Y-%m-%d %H:%M:%S'
+        self.log_batch_size = crawler_settings.getint('LOG_DB_BATCH_SIZE', 100)
+        self.log_flush_interval = crawler_settings.getfloat('LOG_DB_FLUSH_INTERVAL', 1.0)
+        # Full batches go through COPY, whatever the configured batch size
+        self._log_copy_threshold = min(self.LOG_COPY_THRESHOLD, max(1, self.log_batch_size))
+        # Resolved once here rather than on every spider_opened
+        self._log_level_no = getattr(logging, self.log_level, logging.INFO)
+        self._formatter = logging.Formatter(fmt=self.log_format, datefmt=self.log_dateformat)
 
         self._db_log_handler: DatabaseLogHandler | None = None
         self._root_logger_ref: logging.Logger | None = None
@@ -88,41 +225,64 @@ class LoggingExtension(BaseExtension):
 
     def spider_opened(self, spider: Spider):
         """Called when a spider is opened."""
-        handler = DatabaseLogHandler(self, spider)
-        level = getattr(logging, self.log_level, logging.INFO)
-        handler.setLevel(level)
-        formatter = logging.Formatter(fmt=self.log_format, datefmt=self.log_dateformat)
-        handler.setFormatter(formatter)
-        
-        handler.addFilter(ScrapyAndRootFilter())
-        
-        self._db_log_handler = handler
+        # Connect and create the logs table up front instead of per record
+        self._prepare_db_logging()
 
         root_logger = logging.getLogger()
-        
+
+        # Only one handler may feed the logs table. Check before creating ours,
+        # since creating it starts its writer thread.
         if not any(isinstance(h, DatabaseLogHandler) for h in root_logger.handlers):
+            handler = DatabaseLogHandler(
+                self, spider, batch_size=self.log_batch_size, flush_interval=self.log_flush_interval
+            )
+            handler.setLevel(self._log_level_no)
+            handler.setFormatter(self._formatter)
+
+            handler.addFilter(ScrapyAndRootFilter(spider.name))
+
             root_logger.addHandler(handler)
+            self._db_log_handler = handler
             self._root_logger_ref = root_logger
 
         identifier_column, identifier_value = self.get_identifier_info(spider)
-        message = f"{identifier_column.title()} {identifier_value} started"
-        spider.logger.info(message)
+        self._log_event(spider, logging.INFO, "%s %s started", identifier_column.title(), identifier_value)
 
     def spider_closed(self, spider: Spider, reason: str):
         """Called when a spider is closed."""
         identifier_column, identifier_value = self.get_identifier_info(spider)
-        message = f"{identifier_column.title()} {identifier_value} closed with reason: {reason}"
-        spider.logger.info(message)
+        self._log_event(
+            spider, logging.INFO, "%s %s closed with reason: %s",
+            identifier_column.title(), identifier_value, reason,
+        )
+        if self._db_log_handler:
+            self._db_log_handler.flush()
         self._cleanup()
 
+    def _log_event(self, spider: Spider, level: int, msg: str, *args):
+        """Log an extension event to the console and, if its level passes the
+        DB log level, to the database. The message is only built when stored."""
+        logger.log(level, msg, *args)
+        if level >= self._log_level_no:
+            self._log_to_database(spider, logging.getLevelName(level), msg % args)
+
+    def _log_to_database(self, spider: Spider, log_level: str, message: str):
+        """Queue the message on the active log handler so signal callbacks share
+        its batched writes; write it directly only when no handler is running."""
+        if self._db_log_handler is not None:
+            self._db_log_handler.enqueue_message(log_level, message)
+        else:
+            super()._log_to_database(spider, log_level, message)
+
     def engine_stopped(self):
         """Called when the Scrapy engine stops."""
         self._cleanup()
 
     def _cleanup(self):
-        """Removes the log handler."""
-        if self._db_log_handler and self._root_logger_ref:
-            self._root_logger_ref.removeHandler(self._db_log_handler)
+        """Removes the log handler and stops its writer thread."""
+        if self._db_log_handler:
+            if self._root_logger_ref:
+                self._root_logger_ref.removeHandler(self._db_log_handler)
             self._db_log_handler.close()
 
             self._db_log_handler = None
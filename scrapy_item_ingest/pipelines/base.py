@@ -17,6 +17,7 @@ class BasePipeline:
         self.settings = settings
         self.db = None
         self.schema_manager = None
+        self._job_id = None
         validate_settings(settings)
 
     @classmethod
@@ -27,16 +28,24 @@ class BasePipeline:
 
     def open_spider(self, spider):
         """Called when spider is opened"""
+        # The identifier cannot change while the spider runs; resolve it once
+        self._job_id = self.settings.get_identifier_value(spider)
+
         # Establish database connection
-        self.db = DatabaseConnection(self.settings.db_url)
+        self.db = DatabaseConnection(self.settings.db_url, self.settings.db_pool_size)
         if not self.db.connect():
             raise Exception("Failed to connect to database")
 
         # Initialize schema manager
         self.schema_manager = SchemaManager(self.db, self.settings)
 
-        # Ensure tables exist
+        # Ensure tables exist, with a job_id column our inserts can compare against
         self.schema_manager.ensure_tables_exist()
+        self.schema_manager.check_identifier_type(
+            self.settings.db_items_table, self.settings.db_requests_table
+        )
+        # Keep the shared pool open until every crawler's pipeline has closed
+        self.db.acquire()
 
     def close_spider(self, spider):
         """Called when spider is closed"""
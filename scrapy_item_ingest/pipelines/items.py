@@ -4,6 +4,7 @@ Items pipeline for storing scraped items.
 import logging
 
 from itemadapter import ItemAdapter
+from psycopg2.extras import Json
 from scrapy.exceptions import DropItem
 
 from .base import BasePipeline
@@ -16,9 +17,20 @@ logger = logging.getLogger(__name__)
 class ItemsPipeline(BasePipeline):
     """Pipeline for handling scraped items"""
 
+    # Server-side prepared statement for the per-item INSERT
+    ITEM_INSERT_STATEMENT = "sii_item_insert"
+
+    def open_spider(self, spider):
+        """Called when spider is opened"""
+        super().open_spider(spider)
+        self._item_insert_statement = self.db.prepare(
+            self.ITEM_INSERT_STATEMENT,
+            f"INSERT INTO {self.settings.db_items_table} (job_id, item, created_at) VALUES ($1, $2, $3)",
+        )
+
     def process_item(self, item, spider):
         """Process and store item in database"""
-        job_id = self.settings.get_identifier_value(spider)
+        job_id = self._job_id
 
         adapter = ItemAdapter(item)
         item_dict = adapter.asdict()
@@ -26,11 +38,12 @@ class ItemsPipeline(BasePipeline):
 
         # Store everything as JSON in the item column
         try:
-            sql = f"INSERT INTO {self.settings.db_items_table} (job_id, item, created_at) VALUES (%s, %s, %s)"
-            json_data = serialize_item_data(item_dict)
+            # Let psycopg2 adapt the dict itself, serializing it exactly once
+            json_data = Json(item_dict, dumps=serialize_item_data)
 
-            self.db.execute(sql, (job_id, json_data, created_at))
-            self.db.commit()
+            # One round trip per item: no separate BEGIN/COMMIT around the INSERT
+            with self.db.autocommit():
+                self.db.execute_prepared(self._item_insert_statement, (job_id, json_data, created_at))
         except Exception as e:
             self.db.rollback()
             raise DropItem(f"DB insert error: {e}")
@@ -2,25 +2,87 @@
 Requests pipeline for tracking request information.
 """
 import logging
+import queue
+import threading
+import time
+import weakref
 
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.extras import execute_values
 from scrapy import signals
 
 from .base import BasePipeline
 from ..utils.fingerprint import get_request_fingerprint
+from ..utils.lru import LRUDict
 from ..utils.time import get_current_datetime
 
 logger = logging.getLogger(__name__)
 
 
 class RequestsPipeline(BasePipeline):
-    """Pipeline for handling request tracking"""
+    """
+    Pipeline for handling request tracking.
+    Signal handlers only build rows and queue them; a background writer thread
+    owns the lookup maps and writes the rows in batches, so the reactor never
+    waits on the database unless the queue is full.
+    """
+
+    # Upper bound for each lookup map; the oldest entries are evicted first
+    TRACKING_MAXSIZE = 50000
+    # Rows queued for the writer before the signal handlers block
+    QUEUE_MAXSIZE = 5000
+    # Seconds a signal handler waits on a full queue before dropping its row
+    QUEUE_PUT_TIMEOUT = 5
+    # Seconds close_spider waits for the writer to drain the queue
+    SHUTDOWN_TIMEOUT = 60
 
     def __init__(self, settings):
         super().__init__(settings)
-        self.request_id_map = {}  # Track fingerprint to database ID mapping
-        self.url_to_id_map = {}  # Track URL to database ID mapping
+        self.request_id_map = LRUDict(maxsize=self.TRACKING_MAXSIZE)  # Track fingerprint to database ID mapping
+        self.url_to_id_map = LRUDict(maxsize=self.TRACKING_MAXSIZE)  # Track URL to database ID mapping
         self.current_response_url = None  # Track current response being processed
-        self.request_start_times = {}  # Track request start times for response_time calculation
+        # Track request start times for response_time calculation
+        self.request_start_times = LRUDict(maxsize=self.TRACKING_MAXSIZE)
+        # Fingerprints computed at scheduling time, reused when the response arrives
+        self._fingerprints = weakref.WeakKeyDictionary()
+        # Request rows waiting for the next batched INSERT
+        self._pending_inserts = []
+        self._batch_size = max(1, settings.crawler_settings.getint('REQUESTS_DB_BATCH_SIZE', 100))
+        self._flush_interval = settings.crawler_settings.getfloat('REQUESTS_DB_FLUSH_INTERVAL', 1.0)
+        self._queue = queue.Queue(maxsize=self.QUEUE_MAXSIZE)
+        self._writer = None
+        self.dropped_requests = 0
+        table = settings.db_requests_table
+        # Parents not resolved from url_to_id_map are looked up by the INSERT
+        # itself, through the (job_id, md5(url)) index, which stays within the
+        # B-tree entry size however long a URL is; rows without a parent URL
+        # skip the lookup. The casts give the VALUES columns the table's types
+        self._insert_sql = f"""
+        INSERT INTO {table}
+        (job_id, url, method, fingerprint, parent_id, parent_url, status_code, response_time, created_at)
+        SELECT v.job_id, v.url, v.method, v.fingerprint,
+            CASE
+                WHEN v.parent_id IS NOT NULL THEN v.parent_id
+                WHEN v.parent_url IS NOT NULL THEN (
+                    SELECT p.id FROM {table} AS p
+                    WHERE p.job_id = v.job_id AND md5(p.url) = md5(v.parent_url)
+                        AND p.url = v.parent_url
+                    ORDER BY p.created_at DESC LIMIT 1
+                )
+            END,
+            v.parent_url, v.status_code, v.response_time, v.created_at
+        FROM (VALUES %s) AS v(job_id, url, method, fingerprint, parent_id, parent_url,
+                              status_code, response_time, created_at)
+        RETURNING id, fingerprint, url, parent_id, parent_url
+        """
+        self._insert_template = (
+            f"(%s::{settings.get_identifier_type()}, %s, %s, %s, %s::integer, %s,"
+            f" %s::integer, %s::float8, %s::timestamp)"
+        )
+        self._link_parents_sql = f"""
+        UPDATE {table} AS r SET parent_id = v.parent_id
+        FROM (VALUES %s) AS v(id, parent_id) WHERE r.id = v.id
+        """
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -31,53 +93,56 @@ class RequestsPipeline(BasePipeline):
         crawler.signals.connect(pipeline.response_received, signal=signals.response_received)
         return pipeline
 
-    def _get_parent_request_info(self, request, spider):
-        """Extract parent request information if available"""
-        parent_id = None
-        parent_url = None
+    def open_spider(self, spider):
+        """Called when spider is opened"""
+        super().open_spider(spider)
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="RequestsPipeline-writer", daemon=True
+        )
+        self._writer.start()
 
-        # Get job_id for the current spider
-        job_id = self.settings.get_identifier_value(spider)
+    def _get_parent_urls(self, request):
+        """Extract the candidate parent URLs: the current response's and the referer.
+        The writer picks between them once it knows which parents have IDs.
+        """
+        response_url = None
+        referer = None
 
         try:
             # Method 1: Use current response URL as parent (most reliable)
-            if self.current_response_url and self.current_response_url != request.url:
-                parent_url = self.current_response_url
-                if parent_url in self.url_to_id_map:
-                    parent_id = self.url_to_id_map[parent_url]
+            current_response_url = self.current_response_url
+            if current_response_url and current_response_url != request.url:
+                response_url = current_response_url
 
             # Method 2: Check request meta for referer
-            if not parent_id and hasattr(request, 'meta') and request.meta:
-                if 'referer' in request.meta:
-                    parent_url = request.meta['referer']
-
-                    # Look up in our URL mapping first (faster)
-                    if parent_url in self.url_to_id_map:
-                        parent_id = self.url_to_id_map[parent_url]
-                    else:
-                        # Look up in database
-                        try:
-                            sql = f"SELECT id FROM {self.settings.db_requests_table} WHERE url = %s AND job_id = %s ORDER BY created_at DESC LIMIT 1"
-                            result = self.db.execute(sql, (parent_url, job_id))
-                            if result:
-                                parent_id = result[0]
-                                # Cache the result
-                                self.url_to_id_map[parent_url] = parent_id
-
-                        except Exception as e:
-                            logger.warning(f"Could not look up parent ID by referer URL: {e}")
+            meta = getattr(request, 'meta', None)
+            referer = meta.get('referer') if meta else None
 
         except Exception as e:
-            logger.warning(f"Could not extract parent request info: {e}")
+            logger.warning("Could not extract parent request info: %s", e)
 
-        return parent_id, parent_url
+        return response_url, referer
+
+    @staticmethod
+    def _resolve_parent(row, url_to_id_map):
+        """Fill in parent_id and parent_url (columns 4 and 5) of a queued row.
+        The current response wins when its ID is known; otherwise the referer
+        is used, and the INSERT looks it up if it is not cached either.
+        """
+        *row, referer = row
+        parent_id = url_to_id_map.get(row[5]) if row[5] else None
+        if parent_id is None and referer:
+            row[5] = referer
+            parent_id = url_to_id_map.get(referer)
+        row[4] = parent_id
+        return tuple(row)
 
     def log_request(self, request, spider, response=None):
         """Log request to database with complete information"""
-        job_id = self.settings.get_identifier_value(spider)
+        job_id = self._job_id
 
-        fingerprint = get_request_fingerprint(request)
-        parent_id, parent_url = self._get_parent_request_info(request, spider)
+        fingerprint = self._fingerprints.pop(request, None) or get_request_fingerprint(request)
+        response_url, referer = self._get_parent_urls(request)
         created_at = get_current_datetime(self.settings)
 
         # Get status code and response time if response is available
@@ -85,7 +150,6 @@ class RequestsPipeline(BasePipeline):
         response_time = None
         
         if response:
-            fingerprint = get_request_fingerprint(request)
             request_start_time = self.request_start_times.get(fingerprint)
             if request_start_time:
                 current_time = created_at.timestamp()
@@ -93,39 +157,161 @@ class RequestsPipeline(BasePipeline):
                 # Clean up the start time to free memory
                 self.request_start_times.pop(fingerprint, None)
 
-        sql = f"""
-        INSERT INTO {self.settings.db_requests_table}
-        (job_id, url, method, fingerprint, parent_id, parent_url, status_code, response_time, created_at) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
-        """
+        # Written by the writer thread; the parent is resolved there.
+        # Blocks only when the writer has fallen QUEUE_MAXSIZE rows behind,
+        # and never on a writer that has stopped.
+        if self._writer is None or not self._writer.is_alive():
+            self.dropped_requests += 1
+            return
         try:
-            result = self.db.execute(sql, (
+            self._queue.put((
                 job_id,
                 request.url,
                 request.method,
                 fingerprint,
-                parent_id,
-                parent_url,
+                None,
+                response_url,
                 status_code,
                 response_time,
-                created_at
-            ))
+                created_at,
+                referer
+            ), timeout=self.QUEUE_PUT_TIMEOUT)
+        except queue.Full:
+            self.dropped_requests += 1
 
-            # Get the inserted record ID and store it for future parent lookups
-            if result:
-                record_id = result[0]
-                self.request_id_map[fingerprint] = record_id
-                self.url_to_id_map[request.url] = record_id  # Store URL to ID mapping
+    def _writer_loop(self):
+        """Batch queued rows until ``_batch_size`` rows or ``_flush_interval`` seconds, then write them."""
+        stopping = False
+        while not stopping:
+            row = self._queue.get()
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if row is None:
+                    stopping = True
+                    break
+                self._pending_inserts.append(row)
+                if len(self._pending_inserts) >= self._batch_size:
+                    break
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        row = self._queue.get(timeout=remaining)
+                    else:
+                        row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._flush_inserts()
+            except Exception:
+                # Keep draining: a dead writer would leave the queue to fill up
+                logger.exception("Error in RequestsPipeline writer")
+        # The writer's pooled connection is not needed once it stops
+        self.db.release()
 
-                self.db.commit()
+    def _flush_inserts(self):
+        """Write buffered request rows with one multi-row INSERT and a single commit"""
+        if not self._pending_inserts:
+            return
+        rows, self._pending_inserts = self._pending_inserts, []
 
-        except Exception as e:
-            logger.error(f"Failed to log request: {e}")
+        # Pick each row's parent, with its ID if written by an earlier batch
+        url_to_id_map = self.url_to_id_map
+        rows = [self._resolve_parent(row, url_to_id_map) for row in rows]
+
+        try:
+            try:
+                inserted = self._write_rows(rows)
+            except (InterfaceError, OperationalError):
+                # The connection may have been dropped (e.g. the pool was closed
+                # or the server restarted); the next cursor() borrows a fresh
+                # one, so retry once.
+                self._rollback_quietly()
+                inserted = self._write_rows(rows)
+        except (InterfaceError, OperationalError) as e:
+            logger.error("Failed to log %d requests: %s", len(rows), e)
+            self._rollback_quietly()
+            return
+        except Exception:
+            # One bad row (e.g. a NUL byte or an over-long method) fails the
+            # whole statement, so fall back to row-by-row inserts to keep the
+            # rest of the batch
+            self._rollback_quietly()
+            inserted = self._write_rows_singly(rows)
+
+        # Store the inserted record IDs for future parent lookups. Only
+        # committed rows are stored, so no later row can reference a parent
+        # that was rolled back.
+        for record_id, fingerprint, url, _, _ in inserted:
+            self.request_id_map[fingerprint] = record_id
+            self.url_to_id_map[url] = record_id  # Store URL to ID mapping
+
+    def _write_rows(self, rows):
+        """Insert rows with one multi-row INSERT, link same-batch parents and commit.
+        Returns the RETURNING rows."""
+        with self.db.cursor() as cur:
+            inserted = execute_values(
+                cur, self._insert_sql, rows, template=self._insert_template,
+                page_size=len(rows), fetch=True
+            )
+        self._link_parents(inserted)
+        self.db.commit()
+        return inserted
+
+    def _write_rows_singly(self, rows):
+        """Insert and commit rows one at a time, skipping any that fail.
+        Each row commits before the next is sent, so the INSERT's parent lookup
+        still finds parents from earlier in the batch."""
+        inserted = []
+        for row in rows:
+            try:
+                inserted.extend(self._write_rows([row]))
+            except Exception as e:
+                logger.error("Failed to log request %s: %s", row[1], e)
+                self._rollback_quietly()
+        return inserted
+
+    def _rollback_quietly(self):
+        try:
             self.db.rollback()
+        except Exception:
+            # The connection is gone; the next write borrows a fresh one
+            pass
+
+    def _link_parents(self, inserted):
+        """Set parent_id on inserted rows whose parent was written in the same batch"""
+        # The INSERT's parent lookup cannot see rows inserted by the same statement
+        batch_ids = {url: record_id for record_id, _, url, _, _ in inserted}
+        links = []
+        for record_id, _, _, parent_id, parent_url in inserted:
+            if parent_id is None and parent_url:
+                parent_id = batch_ids.get(parent_url)
+                if parent_id is not None:
+                    links.append((record_id, parent_id))
+        if links:
+            with self.db.cursor() as cur:
+                execute_values(cur, self._link_parents_sql, links, page_size=len(links))
+
+    def close_spider(self, spider):
+        """Write any queued requests before the connection is closed"""
+        writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            try:
+                self._queue.put(None, timeout=self.SHUTDOWN_TIMEOUT)
+            except queue.Full:
+                pass
+            writer.join(timeout=self.SHUTDOWN_TIMEOUT)
+            if writer.is_alive():
+                logger.warning("Request writer did not finish; %d queued requests not written",
+                               self._queue.qsize())
+        if self.dropped_requests:
+            logger.warning("Dropped %d requests: request writer was stopped or too far behind",
+                           self.dropped_requests)
+        super().close_spider(spider)
 
     def request_scheduled(self, request, spider):
         """Called when a request is scheduled - track start time"""
         fingerprint = get_request_fingerprint(request)
+        self._fingerprints[request] = fingerprint
         current_time = get_current_datetime(self.settings).timestamp()
         self.request_start_times[fingerprint] = current_time
 
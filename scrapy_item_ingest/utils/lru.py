@@ -0,0 +1,40 @@
+"""
+Bounded mapping utilities for per-crawl lookup tables.
+"""
+from collections import OrderedDict
+from functools import partial
+
+
+class LRUDict(OrderedDict):
+    """
+    Dictionary holding at most ``maxsize`` entries.
+    ``get`` and writes mark a key as recently used; once full, every insert
+    evicts the least recently used entry. Plain ``d[key]`` reads leave the
+    order alone, so copying or iterating never reorders the map.
+    """
+
+    def __init__(self, *args, maxsize=50000, **kwargs):
+        # Set before filling: OrderedDict.__init__ inserts through __setitem__
+        self.maxsize = maxsize
+        super().__init__(*args, **kwargs)
+
+    def get(self, key, default=None):
+        """Return the value for key (marking it as recently used) or default"""
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def copy(self):
+        """Return a shallow copy with the same ``maxsize``"""
+        return self.__class__(self, maxsize=self.maxsize)
+
+    def __reduce__(self):
+        # Pickle and copy.copy rebuild with our maxsize before re-inserting items
+        return partial(self.__class__, maxsize=self.maxsize), (), None, None, iter(self.items())
@@ -3,17 +3,27 @@ from datetime import datetime
 import pytz
 
 
-def get_current_datetime(settings):
-    """
-    Returns the current datetime localized to the timezone defined by settings.get_tz().
-    Raises a TypeError if settings is None or invalid.
-    """
+def _get_timezone(settings):
     if settings is None:
         raise TypeError("settings must not be None")
     tzname = settings.get_tz()
     try:
-        tz = pytz.timezone(tzname)
+        return pytz.timezone(tzname)
     except Exception as e:
         raise ValueError(f"invalid timezone '{tzname}'") from None
 
-    return tz.localize(datetime.now())
+
+def get_current_datetime(settings):
+    """
+    Returns the current datetime localized to the timezone defined by settings.get_tz().
+    Raises a TypeError if settings is None or invalid.
+    """
+    return _get_timezone(settings).localize(datetime.now())
+
+
+def get_datetime_from_timestamp(settings, timestamp):
+    """
+    Returns the datetime for a POSIX timestamp (e.g. ``LogRecord.created``), localized
+    the same way as get_current_datetime().
+    """
+    return _get_timezone(settings).localize(datetime.fromtimestamp(timestamp))
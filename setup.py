@@ -50,6 +50,7 @@ setup(
         "docs": [
             "sphinx>=5.0.0",
             "sphinx_rtd_theme>=1.2.0",
+            "sphinx-autoapi>=3.0.0",
             "myst-parser>=0.18.0",
             "sphinx-autodoc-typehints>=1.19.0",
             "sphinx-copybutton>=0.5.0",